@@ -0,0 +1,151 @@
+"""
+Backup module for Financial Transactions TCG
+Online backups and pre-import snapshots using SQLite's incremental backup API
+"""
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+
+class BackupError(Exception):
+    """The backup could not be completed within the time limit"""
+
+
+class _BackupRestarted(Exception):
+    """Raised from the progress callback to retry a backup with larger steps"""
+
+
+class BackupManager:
+    """
+    Copies a live database without blocking writers.
+
+    The backup API copies pages_per_step pages at a time and the progress
+    callback pauses between steps, so an import running on another
+    connection can still commit while a large file is being copied.
+    """
+
+    def __init__(self, db_path: str, snapshot_dir: Optional[str] = None, keep_snapshots: int = 10,
+                 pages_per_step: int = 256, pause_seconds: float = 0.005, max_restarts: int = 3,
+                 max_pages_per_step: int = 4096, timeout_seconds: float = 300.0, verbose: bool = True,
+                 progress_callback: Optional[Callable[[str], None]] = None):
+        """
+        Initialize backup manager for db_path; snapshots default to '<name>_snapshots'.
+        With verbose=False only errors are printed to the console.
+        """
+        self.db_path = db_path
+        stem = os.path.splitext(db_path)[0]
+        self.snapshot_dir = snapshot_dir or f"{stem}_snapshots"
+        self.keep_snapshots = keep_snapshots
+        self.pages_per_step = pages_per_step
+        self.pause_seconds = pause_seconds
+        self.max_restarts = max_restarts
+        self.max_pages_per_step = max_pages_per_step
+        self.timeout_seconds = timeout_seconds
+        self.verbose = verbose
+        self.progress_callback = progress_callback
+
+    def _log(self, message: str, error: bool = False):
+        """Log message to console and optionally to GUI"""
+        if self.verbose or error:
+            print(message)
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def _copy(self, src_path: str, dest_path: str, pages: int):
+        """
+        Copy src into dest with the backup API, pausing between steps.
+        SQLite restarts the copy whenever another connection writes to the
+        source; after max_restarts restarts the step size is increased, up to
+        max_pages_per_step so the read lock is never held for the whole file.
+        Raises BackupError if the copy does not finish within timeout_seconds.
+        """
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            restarts = 0
+            last_remaining = None
+
+            def on_step(status, remaining, total):
+                nonlocal restarts, last_remaining
+                if remaining and time.monotonic() > deadline:
+                    raise BackupError(f"Backup nach {self.timeout_seconds:.0f}s abgebrochen, "
+                                      f"die Datenbank wird laufend geändert")
+                if last_remaining is not None and remaining > last_remaining:
+                    restarts += 1
+                    if restarts > self.max_restarts:
+                        raise _BackupRestarted()
+                last_remaining = remaining
+                # Give writers on other connections a chance between steps
+                if remaining and self.pause_seconds:
+                    time.sleep(self.pause_seconds)
+
+            src = sqlite3.connect(src_path)
+            dest = sqlite3.connect(dest_path)
+            try:
+                src.backup(dest, pages=pages, progress=on_step)
+                return
+            except _BackupRestarted:
+                pages = min(pages * 8, max(pages, self.max_pages_per_step))
+                self._log(f"Backup wurde durch Schreibzugriffe neu gestartet, "
+                          f"kopiere {pages} Seiten pro Schritt")
+            finally:
+                dest.close()
+                src.close()
+
+    def backup(self, dest_path: str) -> str:
+        """Write a consistent copy of the database to dest_path"""
+        if os.path.abspath(dest_path) == os.path.abspath(self.db_path):
+            raise ValueError("Backup-Ziel darf nicht die Datenbank selbst sein")
+
+        # Write to a temporary file first so an aborted backup never leaves a half copy
+        tmp_path = dest_path + ".part"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        start = time.perf_counter()
+        try:
+            self._copy(self.db_path, tmp_path, self.pages_per_step)
+            os.replace(tmp_path, dest_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._log(f"💾 Backup erstellt: {dest_path} ({time.perf_counter() - start:.1f}s)")
+        return dest_path
+
+    def create_snapshot(self, label: str = "snapshot") -> str:
+        """Create a timestamped snapshot and prune the oldest ones"""
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(self.db_path))[0]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        snapshot_path = os.path.join(self.snapshot_dir, f"{stem}_{timestamp}_{label}.db")
+
+        self.backup(snapshot_path)
+        self._prune_snapshots()
+        return snapshot_path
+
+    def list_snapshots(self) -> List[str]:
+        """Get all snapshots of this database, newest first"""
+        if not os.path.isdir(self.snapshot_dir):
+            return []
+        stem = os.path.splitext(os.path.basename(self.db_path))[0]
+        names = [name for name in os.listdir(self.snapshot_dir)
+                 if name.startswith(f"{stem}_") and name.endswith(".db")]
+        return [os.path.join(self.snapshot_dir, name) for name in sorted(names, reverse=True)]
+
+    def _prune_snapshots(self):
+        """Delete snapshots beyond keep_snapshots"""
+        for old_snapshot in self.list_snapshots()[self.keep_snapshots:]:
+            try:
+                os.remove(old_snapshot)
+            except OSError as e:
+                self._log(f"❌ Snapshot konnte nicht gelöscht werden: {e}", error=True)
+
+    def restore_snapshot(self, snapshot_path: str):
+        """Replace the database content with a snapshot"""
+        start = time.perf_counter()
+        # Single step: the restore must not interleave with other writers
+        self._copy(snapshot_path, self.db_path, -1)
+        self._log(f"⏪ Snapshot wiederhergestellt: {os.path.basename(snapshot_path)} "
+                  f"({time.perf_counter() - start:.1f}s)")
@@ -0,0 +1,92 @@
+"""
+Balance Chart module for Financial Transactions TCG
+Draws the running balance over time with QPainter
+"""
+from datetime import date
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QPainter, QPen, QColor, QPolygonF
+from database import DatabaseManager
+
+
+class BalanceChartWidget(QWidget):
+    """
+    Line chart of the running balance.
+    The series is requested downsampled to the plot width, so drawing costs
+    the same for a few hundred or a few million transactions.
+    """
+
+    MARGIN_LEFT = 90
+    MARGIN_RIGHT = 20
+    MARGIN_TOP = 20
+    MARGIN_BOTTOM = 30
+
+    def __init__(self, db_manager: DatabaseManager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self._series = None
+        self.setMinimumSize(400, 250)
+
+    def resizeEvent(self, event):
+        """Resample for the new width"""
+        self._series = None
+        super().resizeEvent(event)
+
+    def _plot_rect(self) -> QRectF:
+        return QRectF(
+            self.MARGIN_LEFT, self.MARGIN_TOP,
+            max(1, self.width() - self.MARGIN_LEFT - self.MARGIN_RIGHT),
+            max(1, self.height() - self.MARGIN_TOP - self.MARGIN_BOTTOM)
+        )
+
+    def paintEvent(self, event):
+        """Draw axes, zero line and balance curve"""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), QColor("#ffffff"))
+        rect = self._plot_rect()
+
+        if self._series is None:
+            self._series = self.db_manager.get_balance_series(max_points=int(rect.width()))
+
+        if len(self._series) < 2:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Keine Daten für den Saldoverlauf")
+            return
+
+        # Scale x by real day distance, not by point index
+        days = [date.fromisoformat(day).toordinal() for day, _ in self._series]
+        balances = [balance for _, balance in self._series]
+        x_min, x_max = days[0], days[-1]
+        y_min, y_max = min(balances + [0.0]), max(balances + [0.0])
+        x_span = (x_max - x_min) or 1
+        y_span = (y_max - y_min) or 1.0
+
+        def to_point(x, y):
+            return QPointF(
+                rect.left() + (x - x_min) / x_span * rect.width(),
+                rect.bottom() - (y - y_min) / y_span * rect.height()
+            )
+
+        # Axes
+        painter.setPen(QPen(QColor("#999999"), 1))
+        painter.drawRect(rect)
+        zero_y = to_point(x_min, 0.0).y()
+        painter.setPen(QPen(QColor("#cccccc"), 1, Qt.PenStyle.DashLine))
+        painter.drawLine(QPointF(rect.left(), zero_y), QPointF(rect.right(), zero_y))
+
+        # Curve
+        polygon = QPolygonF([to_point(x, y) for x, y in zip(days, balances)])
+        painter.setPen(QPen(QColor("#2e7d32" if balances[-1] >= 0 else "#c62828"), 1.5))
+        painter.drawPolyline(polygon)
+
+        # Labels
+        painter.setPen(QColor("#333333"))
+        label_width = self.MARGIN_LEFT - 8
+        painter.drawText(QRectF(0, rect.top() - 8, label_width, 16),
+                         Qt.AlignmentFlag.AlignRight, f"€{y_max:,.0f}")
+        painter.drawText(QRectF(0, rect.bottom() - 8, label_width, 16),
+                         Qt.AlignmentFlag.AlignRight, f"€{y_min:,.0f}")
+        painter.drawText(QRectF(rect.left(), rect.bottom() + 4, 120, 16),
+                         Qt.AlignmentFlag.AlignLeft, self._series[0][0])
+        painter.drawText(QRectF(rect.right() - 120, rect.bottom() + 4, 120, 16),
+                         Qt.AlignmentFlag.AlignRight, self._series[-1][0])
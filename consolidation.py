@@ -0,0 +1,103 @@
+"""
+Consolidation module for Financial Transactions TCG
+Computes group totals across many branch databases at once
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from database import DatabaseManager
+
+
+class ConsolidatedAnalytics:
+    """
+    Aggregates statistics over several transaction databases.
+
+    Every database is opened on its own read-only connection in a worker
+    thread, so files are never copied or locked for writing. SQLite's ATTACH
+    is limited to 10 databases per connection by default, which is why
+    parallel connections are used instead of one attached super-query.
+    """
+
+    def __init__(self, db_paths: List[str], max_workers: Optional[int] = None,
+                 progress_callback: Optional[Callable[[str], None]] = None):
+        """Initialize with the list of database files to consolidate"""
+        self.db_paths = list(dict.fromkeys(db_paths))  # Drop duplicates, keep order
+        self.max_workers = max_workers or min(8, len(self.db_paths) or 1)
+        self.progress_callback = progress_callback
+
+    def _log(self, message: str):
+        """Log message to console and optionally to GUI"""
+        print(message)
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    @staticmethod
+    def _analyze_database(db_path: str) -> dict:
+        """Collect statistics and breakdowns of a single database (runs in worker thread)"""
+        db = DatabaseManager(db_path, read_only=True)
+        try:
+            return {
+                'statistics': db.get_statistics(),
+                'monthly': db.get_monthly_totals(),
+                'categories': db.get_category_totals(),
+            }
+        finally:
+            db.close()
+
+    @staticmethod
+    def _merge_breakdown(target: Dict[str, list], rows: List[tuple]):
+        """Add (key, income, expense, count) rows into a running total dict"""
+        for key, income, expense, count in rows:
+            totals = target.setdefault(key, [0.0, 0.0, 0])
+            totals[0] += income or 0.0
+            totals[1] += expense or 0.0
+            totals[2] += count
+
+    def run(self) -> dict:
+        """
+        Analyze all databases concurrently
+        Returns: {
+            'databases': {db_path: {'statistics', 'monthly', 'categories'}},
+            'errors': {db_path: error message},
+            'total': {'statistics', 'monthly', 'categories'}
+        }
+        """
+        results = {}
+        errors = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._analyze_database, path): path
+                       for path in self.db_paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results[path] = future.result()
+                    self._log(f"✅ {os.path.basename(path)} ausgewertet")
+                except Exception as e:
+                    errors[path] = str(e)
+                    self._log(f"❌ {os.path.basename(path)}: {e}")
+
+        # Keep the order in which the databases were passed in
+        databases = {path: results[path] for path in self.db_paths if path in results}
+
+        total_stats = {'total_transactions': 0, 'total_income': 0.0,
+                       'total_expenses': 0.0, 'balance': 0.0}
+        monthly = {}
+        categories = {}
+        for data in databases.values():
+            for key in total_stats:
+                total_stats[key] += data['statistics'][key]
+            self._merge_breakdown(monthly, data['monthly'])
+            self._merge_breakdown(categories, data['categories'])
+
+        return {
+            'databases': databases,
+            'errors': errors,
+            'total': {
+                'statistics': total_stats,
+                'monthly': [(key, *values) for key, values in
+                            sorted(monthly.items(), key=lambda item: item[0] or "")],
+                'categories': [(key, *values) for key, values in
+                               sorted(categories.items(), key=lambda item: item[0] or "")],
+            },
+        }
@@ -2,23 +2,52 @@
 Database module for Financial Transactions TCG
 Handles all database operations for transactions and categories
 """
+import hashlib
 import sqlite3
-from datetime import datetime
-from typing import List, Tuple, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date as date_type, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple, Optional
+from timeseries import lttb, minmax_downsample
 
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "transactions.db"):
-        """Initialize database connection and create tables if needed"""
+    def __init__(self, db_path: str = "transactions.db", read_only: bool = False,
+                 cache_max_entries: int = 64, cache_max_rows: int = 500000):
+        """
+        Initialize database connection and create tables if needed.
+        With read_only=True the file is opened via a read-only URI and the
+        schema is left untouched (used for consolidated analytics).
+        Read query results are kept in an LRU cache of up to
+        cache_max_entries queries / cache_max_rows rows.
+        """
         self.db_path = db_path
+        self.read_only = read_only
         self.conn = None
         self.cursor = None
+        self._batch_depth = 0
+        
+        # Query result cache, valid while the data version is unchanged
+        self.cache_max_entries = cache_max_entries
+        self.cache_max_rows = cache_max_rows
+        self._query_cache = OrderedDict()
+        self._cache_rows = 0
+        self._cache_version = None
+        self._write_counter = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.connect()
-        self.create_tables()
+        if not self.read_only:
+            self.create_tables()
     
     def connect(self):
         """Establish database connection"""
-        self.conn = sqlite3.connect(self.db_path)
+        if self.read_only:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True)
+        else:
+            self.conn = sqlite3.connect(self.db_path)
         self.cursor = self.conn.cursor()
     
     def create_tables(self):
@@ -32,6 +61,8 @@ class DatabaseManager:
             category TEXT,
             income REAL,
             expense REAL,
+            fingerprint TEXT,
+            duplicate_of INTEGER,
             FOREIGN KEY (category) REFERENCES categories(categoryid)
         )
         ''')
@@ -43,29 +74,317 @@ class DatabaseManager:
             label TEXT
         )
         ''')
+        
+        # Tabelle daily_balance: Tagessummen für den Saldoverlauf
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_balance (
+            day TEXT PRIMARY KEY,
+            income REAL NOT NULL DEFAULT 0,
+            expense REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        
+        # Databases created before content fingerprints existed
+        self._migrate_fingerprints()
+        self.cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_transactions_fingerprint ON transactions(fingerprint)'
+        )
+        
+        # Rebuild the daily totals if rows were added without them (older versions, legacy script)
+        self.cursor.execute('SELECT COUNT(*) FROM transactions')
+        transaction_count = self.cursor.fetchone()[0]
+        self.cursor.execute('SELECT COALESCE(SUM(count), 0) FROM daily_balance')
+        if self.cursor.fetchone()[0] != transaction_count:
+            self.rebuild_daily_balance()
         self.conn.commit()
     
+    def _migrate_fingerprints(self):
+        """Add the fingerprint columns to older databases and backfill missing fingerprints"""
+        self.cursor.execute('PRAGMA table_info(transactions)')
+        columns = [row[1] for row in self.cursor.fetchall()]
+        if 'fingerprint' not in columns:
+            self.cursor.execute('ALTER TABLE transactions ADD COLUMN fingerprint TEXT')
+        if 'duplicate_of' not in columns:
+            self.cursor.execute('ALTER TABLE transactions ADD COLUMN duplicate_of INTEGER')
+        
+        self.cursor.execute('''
+        SELECT id, date, description, category, income, expense
+        FROM transactions WHERE fingerprint IS NULL
+        ''')
+        updates = [(self.compute_fingerprint(*row[1:]), row[0]) for row in self.cursor.fetchall()]
+        if updates:
+            self.cursor.executemany('UPDATE transactions SET fingerprint = ? WHERE id = ?', updates)
+    
+    @staticmethod
+    def normalize_date(value) -> str:
+        """Normalize a date (datetime, date or text) to 'YYYY-MM-DD' where possible"""
+        if isinstance(value, datetime):
+            return value.date().isoformat()
+        if isinstance(value, date_type):
+            return value.isoformat()
+        text = str(value).strip() if value is not None else ""
+        for fmt in ('%Y-%m-%d', '%d.%m.%Y'):
+            try:
+                return datetime.strptime(text[:10], fmt).date().isoformat()
+            except ValueError:
+                continue
+        return text
+    
+    @staticmethod
+    def compute_fingerprint(date, description: str, category: str,
+                            income: Optional[float], expense: Optional[float]) -> str:
+        """
+        Compute a content fingerprint of a transaction independent of its ID.
+        Date, net amount, description and category are normalized so the same
+        bank movement yields the same hash across different workbooks.
+        """
+        amount = round((income or 0.0) - (expense or 0.0), 2)
+        normalized = "|".join([
+            DatabaseManager.normalize_date(date),
+            f"{amount:.2f}",
+            " ".join(str(description or "").lower().split()),
+            str(category or "").strip().lower(),
+        ])
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def fingerprint_candidates(date, description: str, category: str,
+                               income: Optional[float], expense: Optional[float],
+                               window_days: int = 0) -> List[str]:
+        """
+        Fingerprints of the same transaction shifted by up to window_days days.
+        The first entry is always the exact fingerprint.
+        """
+        fingerprints = [DatabaseManager.compute_fingerprint(date, description, category, income, expense)]
+        if window_days > 0:
+            try:
+                base = datetime.strptime(DatabaseManager.normalize_date(date), '%Y-%m-%d')
+            except ValueError:
+                return fingerprints
+            for offset in range(1, window_days + 1):
+                for shifted in (base - timedelta(days=offset), base + timedelta(days=offset)):
+                    fingerprints.append(
+                        DatabaseManager.compute_fingerprint(shifted, description, category, income, expense)
+                    )
+        return fingerprints
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group all writes inside the with-block into a single transaction.
+        Commits once at the end (or rolls back on an exception); nested
+        batches join the outermost one.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.conn.rollback()
+                self._mark_written()
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.conn.commit()
+    
+    def _commit(self):
+        """Commit unless a batch is active"""
+        if self._batch_depth == 0:
+            self.conn.commit()
+    
+    def _mark_written(self):
+        """Invalidate cached query results after a write on this connection"""
+        self._write_counter += 1
+    
+    def _data_version(self) -> Tuple[int, int]:
+        """
+        Current data version: PRAGMA data_version changes when another
+        connection commits, the write counter covers this connection.
+        """
+        self.cursor.execute('PRAGMA data_version')
+        return (self.cursor.fetchone()[0], self._write_counter)
+    
+    def _cached_query(self, sql: str, params: tuple = ()) -> List[Tuple]:
+        """Run a read query through the result cache"""
+        version = self._data_version()
+        if version != self._cache_version:
+            self.clear_cache()
+            self._cache_version = version
+        
+        key = (sql, params)
+        rows = self._query_cache.get(key)
+        if rows is not None:
+            self._query_cache.move_to_end(key)
+            self.cache_hits += 1
+            return list(rows)
+        
+        self.cache_misses += 1
+        self.cursor.execute(sql, params)
+        rows = self.cursor.fetchall()
+        
+        if len(rows) <= self.cache_max_rows:
+            self._query_cache[key] = rows
+            self._cache_rows += len(rows)
+            # Evict least recently used results
+            while (len(self._query_cache) > self.cache_max_entries
+                   or self._cache_rows > self.cache_max_rows):
+                _, evicted = self._query_cache.popitem(last=False)
+                self._cache_rows -= len(evicted)
+        return list(rows)
+    
+    def clear_cache(self):
+        """Drop all cached query results"""
+        self._query_cache.clear()
+        self._cache_rows = 0
+    
+    def cache_info(self) -> dict:
+        """Get hit/miss counters and size of the query result cache"""
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'entries': len(self._query_cache),
+            'rows': self._cache_rows,
+            'max_entries': self.cache_max_entries,
+            'max_rows': self.cache_max_rows,
+        }
+    
     def transaction_exists(self, transaction_id: int) -> bool:
         """Check if a transaction with the given ID already exists"""
         self.cursor.execute('SELECT COUNT(*) FROM transactions WHERE id = ?', (transaction_id,))
         return self.cursor.fetchone()[0] > 0
     
     def insert_transaction(self, trans_id: int, date, description: str, 
-                          category: str, income: float, expense: float) -> bool:
-        """Insert a new transaction, returns True if successful"""
+                          category: str, income: float, expense: float,
+                          fingerprint: Optional[str] = None, duplicate_of: Optional[int] = None) -> bool:
+        """
+        Insert a new transaction, returns True if successful.
+        duplicate_of is the ID of a transaction the importer found with the same content.
+        """
         try:
             if not self.transaction_exists(trans_id):
+                if fingerprint is None:
+                    fingerprint = self.compute_fingerprint(date, description, category, income, expense)
                 self.cursor.execute('''
-                INSERT INTO transactions (id, date, description, category, income, expense)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ''', (trans_id, date, description, category, income, expense))
-                self.conn.commit()
+                INSERT INTO transactions (id, date, description, category, income, expense,
+                                          fingerprint, duplicate_of)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (trans_id, date, description, category, income, expense, fingerprint, duplicate_of))
+                self._add_to_daily_balance(date, income, expense)
+                self._mark_written()
+                self._commit()
                 return True
             return False
-        except Exception as e:
+        except (sqlite3.IntegrityError, sqlite3.InterfaceError) as e:
+            # Bad row data only - locking and I/O errors propagate so batch() can roll back
             print(f"Error inserting transaction {trans_id}: {e}")
             return False
     
+    def get_existing_ids(self, transaction_ids: Iterable[int]) -> Set[int]:
+        """Bulk variant of transaction_exists: which of the given IDs are already stored"""
+        ids = list(set(transaction_ids))
+        existing = set()
+        # Stay below SQLite's limit of host parameters per statement
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            self.cursor.execute(f'SELECT id FROM transactions WHERE id IN ({placeholders})', chunk)
+            existing.update(int(row[0]) for row in self.cursor.fetchall())
+        return existing
+    
+    def find_fingerprints(self, fingerprints: Iterable[str]) -> Dict[str, int]:
+        """Which of the given fingerprints are already stored, mapped to the lowest transaction ID"""
+        values = list(set(fingerprints))
+        found = {}
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            self.cursor.execute(f'''
+            SELECT fingerprint, MIN(id) FROM transactions
+            WHERE fingerprint IN ({placeholders})
+            GROUP BY fingerprint
+            ''', chunk)
+            found.update(self.cursor.fetchall())
+        return found
+    
+    def insert_transactions(self, rows: List[Tuple]) -> Set[int]:
+        """
+        Bulk insert of (id, date, description, category, income, expense, fingerprint,
+        duplicate_of) rows in one statement. IDs already present are left untouched.
+        Returns: set of IDs that were inserted
+        """
+        if not rows:
+            return set()
+        
+        new_rows = []
+        existing_ids = self.get_existing_ids(row[0] for row in rows)
+        for row in rows:
+            if row[0] not in existing_ids:
+                existing_ids.add(row[0])
+                new_rows.append(row)
+        
+        # Savepoint so a failing row undoes only this bulk statement
+        if not self.conn.in_transaction:
+            self.cursor.execute('BEGIN')
+        self.cursor.execute('SAVEPOINT bulk_insert')
+        try:
+            self.cursor.executemany('''
+            INSERT INTO transactions (id, date, description, category, income, expense,
+                                      fingerprint, duplicate_of)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', new_rows)
+        except (sqlite3.IntegrityError, sqlite3.InterfaceError) as e:
+            self.cursor.execute('ROLLBACK TO bulk_insert')
+            self.cursor.execute('RELEASE bulk_insert')
+            # Fall back to row by row so one bad row does not cost the whole batch
+            print(f"Error in bulk insert, inserting row by row: {e}")
+            inserted = {row[0] for row in new_rows if self.insert_transaction(*row)}
+            self._commit()
+            return inserted
+        except sqlite3.Error:
+            # Locked database, disk full, ... - not a row problem, let the caller roll back
+            if self._batch_depth == 0 and self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+        self.cursor.execute('RELEASE bulk_insert')
+        
+        # One daily_balance update per day instead of per row
+        daily = {}
+        for _, date, _, _, income, expense, _, _ in new_rows:
+            totals = daily.setdefault(self.normalize_date(date), [0.0, 0.0, 0])
+            totals[0] += income or 0.0
+            totals[1] += expense or 0.0
+            totals[2] += 1
+        for day, (income, expense, count) in daily.items():
+            self._add_to_daily_balance(day, income, expense, count)
+        
+        self._mark_written()
+        self._commit()
+        return {row[0] for row in new_rows}
+    
+    def _add_to_daily_balance(self, date, income: Optional[float], expense: Optional[float], count: int = 1):
+        """Incrementally update the daily totals for an inserted transaction"""
+        self.cursor.execute('''
+        INSERT INTO daily_balance (day, income, expense, count) VALUES (?, ?, ?, ?)
+        ON CONFLICT(day) DO UPDATE SET
+            income = income + excluded.income,
+            expense = expense + excluded.expense,
+            count = count + excluded.count
+        ''', (self.normalize_date(date), income or 0.0, expense or 0.0, count))
+    
+    def rebuild_daily_balance(self):
+        """Recompute the daily totals from all transactions"""
+        self.cursor.execute('DELETE FROM daily_balance')
+        self.cursor.execute('''
+        SELECT date, COALESCE(SUM(income), 0), COALESCE(SUM(expense), 0), COUNT(*)
+        FROM transactions GROUP BY date
+        ''')
+        for date, income, expense, count in self.cursor.fetchall():
+            self._add_to_daily_balance(date, income, expense, count)
+        self._mark_written()
+        self._commit()
+    
     def insert_category(self, category_id: str, label: str) -> bool:
         """Insert or update a category"""
         try:
@@ -73,7 +392,8 @@ class DatabaseManager:
             INSERT OR IGNORE INTO categories (categoryid, label)
             VALUES (?, ?)
             ''', (category_id, label))
-            self.conn.commit()
+            self._mark_written()
+            self._commit()
             return True
         except Exception as e:
             print(f"Error inserting category {category_id}: {e}")
@@ -81,39 +401,134 @@ class DatabaseManager:
     
     def get_all_transactions(self) -> List[Tuple]:
         """Get all transactions from database"""
-        self.cursor.execute('SELECT * FROM transactions ORDER BY date DESC')
-        return self.cursor.fetchall()
+        return self._cached_query('''
+        SELECT id, date, description, category, income, expense
+        FROM transactions ORDER BY date DESC
+        ''')
     
     def get_all_categories(self) -> List[Tuple]:
         """Get all categories from database"""
-        self.cursor.execute('SELECT * FROM categories ORDER BY label')
-        return self.cursor.fetchall()
+        return self._cached_query('SELECT * FROM categories ORDER BY label')
     
     def get_transaction_count(self) -> int:
         """Get total number of transactions"""
-        self.cursor.execute('SELECT COUNT(*) FROM transactions')
-        return self.cursor.fetchone()[0]
+        return self._cached_query('SELECT COUNT(*) FROM transactions')[0][0]
     
     def get_statistics(self) -> dict:
         """Get statistics about transactions"""
         stats = {}
         
-        # Total transactions
-        stats['total_transactions'] = self.get_transaction_count()
-        
-        # Total income
-        self.cursor.execute('SELECT SUM(income) FROM transactions')
-        stats['total_income'] = self.cursor.fetchone()[0] or 0.0
-        
-        # Total expenses
-        self.cursor.execute('SELECT SUM(expense) FROM transactions')
-        stats['total_expenses'] = self.cursor.fetchone()[0] or 0.0
+        # Count, income and expenses in a single scan
+        count, income, expenses = self._cached_query(
+            'SELECT COUNT(*), SUM(income), SUM(expense) FROM transactions'
+        )[0]
+        stats['total_transactions'] = count
+        stats['total_income'] = income or 0.0
+        stats['total_expenses'] = expenses or 0.0
         
         # Balance
         stats['balance'] = stats['total_income'] - stats['total_expenses']
         
         return stats
     
+    def get_suspected_duplicates(self) -> List[Tuple]:
+        """
+        Get all transactions sharing their content with another one: same
+        fingerprint, or flagged by the importer (duplicate_of, which also
+        covers matches within the duplicate date window)
+        Returns: [(group ID, id, date, description, category, income, expense), ...]
+        where group ID is the lowest ID of the group
+        """
+        return self._cached_query('''
+        WITH links(trans_id, group_id) AS (
+            SELECT t.id, g.first_id FROM transactions t
+            JOIN (
+                SELECT fingerprint, MIN(id) AS first_id FROM transactions
+                WHERE fingerprint IS NOT NULL
+                GROUP BY fingerprint HAVING COUNT(*) > 1
+            ) g ON t.fingerprint = g.fingerprint
+            UNION
+            SELECT id, duplicate_of FROM transactions WHERE duplicate_of IS NOT NULL
+            UNION
+            SELECT duplicate_of, duplicate_of FROM transactions WHERE duplicate_of IS NOT NULL
+        )
+        SELECT MIN(l.group_id) AS group_id, t.id, t.date, t.description, t.category, t.income, t.expense
+        FROM links l JOIN transactions t ON t.id = l.trans_id
+        GROUP BY t.id
+        ORDER BY group_id, t.id
+        ''')
+    
+    def get_monthly_totals(self) -> List[Tuple]:
+        """
+        Get income/expense totals per month
+        Returns: [(month 'YYYY-MM', income, expense, count), ...]
+        
+        Rolled up from the daily totals, whose days went through
+        normalize_date like the fingerprints and the import preview.
+        """
+        try:
+            days = self._cached_query('SELECT day, income, expense, count FROM daily_balance')
+        except sqlite3.OperationalError:
+            # Read-only database of an older version without daily totals
+            days = self._cached_query('''
+            SELECT date, COALESCE(SUM(income), 0), COALESCE(SUM(expense), 0), COUNT(*)
+            FROM transactions GROUP BY date
+            ''')
+        
+        totals = {}
+        for day, income, expense, count in days:
+            entry = totals.setdefault(self.normalize_date(day)[:7], [0.0, 0.0, 0])
+            entry[0] += income
+            entry[1] += expense
+            entry[2] += count
+        return [(month, *values) for month, values in sorted(totals.items())]
+    
+    def get_category_totals(self) -> List[Tuple]:
+        """
+        Get income/expense totals per category
+        Returns: [(category, income, expense, count), ...]
+        """
+        return self._cached_query('''
+        SELECT category,
+               COALESCE(SUM(income), 0), COALESCE(SUM(expense), 0), COUNT(*)
+        FROM transactions
+        GROUP BY category
+        ORDER BY category
+        ''')
+    
+    def get_balance_series(self, max_points: Optional[int] = None,
+                           method: str = 'lttb') -> List[Tuple[str, float]]:
+        """
+        Get the running balance at the end of each day
+        Returns: [(day 'YYYY-MM-DD', balance), ...]
+        
+        Built from the incrementally maintained daily totals, so the cost
+        depends on the number of days, not transactions. With max_points the
+        series is downsampled ('lttb' or 'minmax') e.g. to a chart's pixel width.
+        Rows without a parseable date are not part of the series.
+        """
+        days = self._cached_query('''
+        SELECT day, income - expense FROM daily_balance
+        WHERE day GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+        ORDER BY day
+        ''')
+        
+        points = []
+        balance = 0.0
+        for day, net in days:
+            try:
+                x = datetime.strptime(day, '%Y-%m-%d').toordinal()
+            except ValueError:
+                continue  # Looks like a date but is none, e.g. '2024-02-30'
+            balance += net
+            points.append((x, balance))
+        
+        if max_points:
+            downsample = minmax_downsample if method == 'minmax' else lttb
+            points = downsample(points, max_points)
+        
+        return [(date_type.fromordinal(int(x)).isoformat(), y) for x, y in points]
+    
     def close(self):
         """Close database connection"""
         if self.conn:
@@ -2,54 +2,299 @@
 Excel Importer module for Financial Transactions TCG
 Handles importing data from Excel files
 """
+import os
 import openpyxl
+from dataclasses import dataclass, field
 from typing import Tuple, List, Callable, Optional
+from backup import BackupManager
 from database import DatabaseManager
 
 
+class _SnapshotFailed(Exception):
+    """Raised inside the import batch when the pre-import snapshot could not be taken"""
+
+
+@dataclass
+class TransactionRecord:
+    """One parsed transaction row of a workbook"""
+    sheet: str
+    row_idx: int
+    trans_id: int
+    date: object
+    description: str
+    category: str
+    income: float
+    expense: float
+    fingerprint: str = ""
+    status: str = ""                     # 'new' or 'existing' after classification
+    duplicate_of: Optional[int] = None   # ID of a transaction with the same content
+
+
+@dataclass
+class ImportPreview:
+    """
+    Parsed and classified content of one workbook.
+    Produced by ExcelImporter.preview_file without writing anything; pass it
+    to ExcelImporter.import_preview to import without parsing again.
+    """
+    file_path: str
+    records: List[TransactionRecord] = field(default_factory=list)
+    categories: List[Tuple[str, str]] = field(default_factory=list)
+    errors: List[Tuple[str, int, str]] = field(default_factory=list)  # (sheet, row_idx, message)
+    load_error: Optional[str] = None
+    
+    @property
+    def new_count(self) -> int:
+        return sum(1 for record in self.records if record.status == 'new')
+    
+    @property
+    def existing_count(self) -> int:
+        return sum(1 for record in self.records if record.status == 'existing')
+    
+    @property
+    def duplicate_count(self) -> int:
+        return sum(1 for record in self.records
+                   if record.status == 'new' and record.duplicate_of is not None)
+    
+    @property
+    def error_count(self) -> int:
+        return len(self.errors) + (1 if self.load_error else 0)
+    
+    def monthly_totals(self) -> List[Tuple[str, float, float, int]]:
+        """
+        Totals of the new transactions per month
+        Returns: [(month 'YYYY-MM', income, expense, count), ...]
+        """
+        totals = {}
+        for record in self.records:
+            if record.status != 'new':
+                continue
+            month = DatabaseManager.normalize_date(record.date)[:7]
+            entry = totals.setdefault(month, [0.0, 0.0, 0])
+            entry[0] += record.income
+            entry[1] += record.expense
+            entry[2] += 1
+        return [(month, *values) for month, values in sorted(totals.items())]
+
+
 class ExcelImporter:
-    def __init__(self, db_manager: DatabaseManager, progress_callback: Optional[Callable[[str], None]] = None):
-        """Initialize Excel Importer with database manager"""
+    def __init__(self, db_manager: DatabaseManager, progress_callback: Optional[Callable[[str], None]] = None,
+                 duplicate_window_days: int = 0, skip_suspected_duplicates: bool = False,
+                 verbose: bool = True):
+        """
+        Initialize Excel Importer with database manager.
+        Rows whose content fingerprint (date, amount, description, category)
+        matches an existing transaction under a different ID are flagged as
+        suspected duplicates; duplicate_window_days also matches nearby dates.
+        With verbose=False only errors are printed to the console.
+        """
         self.db = db_manager
         self.imported_count = 0
         self.skipped_count = 0
         self.error_count = 0
         self.progress_callback = progress_callback
+        self.verbose = verbose
+        self.duplicate_window_days = duplicate_window_days
+        self.skip_suspected_duplicates = skip_suspected_duplicates
+        self.file_results = {}          # file_path -> (imported, skipped, errors) of the last import_files
+        self._snapshot_pending = False
     
-    def _log(self, message: str):
-        """Log message to console and optionally to GUI"""
-        print(message)
+    def _log(self, message: str, error: bool = False):
+        """Log message to console and optionally to GUI; errors are printed even when not verbose"""
+        if self.verbose or error:
+            print(message)
         if self.progress_callback:
             self.progress_callback(message)
     
+    def import_files(self, file_paths: List[str], previews: Optional[List[ImportPreview]] = None,
+                     snapshot: bool = True) -> Tuple[int, int, int]:
+        """
+        Import several workbooks in one write transaction. Before the first
+        new transaction is written a snapshot of the database is taken so the
+        import can be rolled back; imports that add nothing take no snapshot.
+        If the snapshot fails nothing is imported.
+        previews (from preview_file, same order) are used instead of parsing again.
+        Returns: (imported_count, skipped_count, error_count) over all files
+        """
+        total_imported = 0
+        total_skipped = 0
+        total_errors = 0
+        self.file_results = {}
+        self._snapshot_pending = snapshot
+        
+        try:
+            with self.db.batch():
+                for i, file_path in enumerate(file_paths, 1):
+                    self._log(f"Importiere {i}/{len(file_paths)}: {os.path.basename(file_path)}...")
+                    if previews:
+                        imported, skipped, errors = self.import_preview(previews[i - 1])
+                    else:
+                        imported, skipped, errors = self.import_file(file_path)
+                    self.file_results[file_path] = (imported, skipped, errors)
+                    total_imported += imported
+                    total_skipped += skipped
+                    total_errors += errors
+        except _SnapshotFailed:
+            # The batch was rolled back - without a rollback point nothing is written
+            self._log("❌ Import abgebrochen, nichts gespeichert", error=True)
+            self.file_results = {file_path: (0, 0, 1) for file_path in file_paths}
+            return (0, 0, len(file_paths))
+        finally:
+            self._snapshot_pending = False
+        
+        return (total_imported, total_skipped, total_errors)
+    
+    def _take_pending_snapshot(self):
+        """Snapshot the database once per import_files call, right before the first write"""
+        if not self._snapshot_pending:
+            return
+        try:
+            BackupManager(self.db.db_path, verbose=self.verbose,
+                          progress_callback=self.progress_callback).create_snapshot("vor_import")
+        except Exception as e:
+            self._log(f"❌ Snapshot vor Import fehlgeschlagen: {e}", error=True)
+            raise _SnapshotFailed() from e
+        self._snapshot_pending = False
+    
     def import_file(self, file_path: str) -> Tuple[int, int, int]:
         """
         Import transactions and categories from Excel file
         Returns: (imported_count, skipped_count, error_count)
         """
+        # import_preview classifies the rows, no need for a full preview_file
+        return self.import_preview(self._parse_file(file_path))
+    
+    def preview_file(self, file_path: str) -> ImportPreview:
+        """
+        Dry run: parse the workbook and classify every row against the
+        database (new / already present / error) without writing anything
+        """
+        preview = self._parse_file(file_path)
+        self._classify(preview)
+        return preview
+    
+    def import_preview(self, preview: ImportPreview) -> Tuple[int, int, int]:
+        """
+        Import a previously parsed workbook
+        Returns: (imported_count, skipped_count, error_count)
+        """
         self.imported_count = 0
         self.skipped_count = 0
-        self.error_count = 0
+        self.error_count = preview.error_count
+        
+        if preview.load_error:
+            return (self.imported_count, self.skipped_count, self.error_count)
+        
+        # The database may have changed since the preview - classification is cheap, parsing is not
+        self._classify(preview)
+        
+        to_insert = []
+        for record in preview.records:
+            if record.status == 'existing':
+                self.skipped_count += 1
+                self._log(f"  ⏭️  Row {record.row_idx}: ID={record.trans_id} übersprungen (bereits vorhanden)")
+                continue
+            
+            if record.duplicate_of is not None:
+                if self.skip_suspected_duplicates:
+                    self.skipped_count += 1
+                    self._log(f"  ⏭️  Row {record.row_idx}: ID={record.trans_id} übersprungen "
+                              f"(Duplikat von ID={record.duplicate_of})")
+                    continue
+                self._log(f"  ⚠️  Row {record.row_idx}: ID={record.trans_id} "
+                          f"vermutliches Duplikat von ID={record.duplicate_of}")
+            
+            to_insert.append(record)
+        
+        if to_insert:
+            self._take_pending_snapshot()
+        
+        inserted_ids = self.db.insert_transactions([
+            (record.trans_id, record.date, record.description, record.category,
+             record.income, record.expense, record.fingerprint, record.duplicate_of)
+            for record in to_insert
+        ])
+        
+        for record in to_insert:
+            if record.trans_id in inserted_ids:
+                self.imported_count += 1
+                self._log(f"  ✅ Row {record.row_idx}: ID={record.trans_id} importiert | "
+                          f"{record.description[:30]} | E:{record.income} A:{record.expense}")
+            else:
+                self.error_count += 1
+                self._log(f"  ❌ Row {record.row_idx}: ID={record.trans_id} konnte nicht importiert werden",
+                          error=True)
+        
+        for category_id, label in preview.categories:
+            if not self.db.insert_category(category_id, label):
+                self._log(f"Error importing category: {category_id}", error=True)
+        
+        if preview.duplicate_count:
+            self._log(f"⚠️  {preview.duplicate_count} vermutliche Duplikate (gleicher Inhalt, andere ID) gefunden")
+        
+        return (self.imported_count, self.skipped_count, self.error_count)
+    
+    def _parse_file(self, file_path: str) -> ImportPreview:
+        """Read transactions and categories of a workbook into an ImportPreview"""
+        preview = ImportPreview(file_path)
         
         try:
-            wb = openpyxl.load_workbook(file_path)
+            wb = openpyxl.load_workbook(file_path, read_only=True)
             
-            # Import transactions from monthly sheets (01-12)
-            self._import_transactions(wb)
+            # Transactions from monthly sheets (01-12)
+            self._parse_transactions(wb, preview)
             
-            # Import categories if "Kategorien" sheet exists
-            self._import_categories(wb)
+            # Categories if "Kategorien" sheet exists
+            self._parse_categories(wb, preview)
             
             wb.close()
-            
+        
         except Exception as e:
-            self._log(f"Error loading Excel file: {e}")
-            self.error_count += 1
+            self._log(f"Error loading Excel file {os.path.basename(file_path)}: {e}", error=True)
+            preview.load_error = str(e)
         
-        return (self.imported_count, self.skipped_count, self.error_count)
+        return preview
     
-    def _import_transactions(self, workbook):
-        """Import transactions from monthly sheets (01-12)"""
+    def _classify(self, preview: ImportPreview):
+        """
+        Mark every record as 'new' or 'existing' and flag content duplicates,
+        with one bulk lookup for the IDs and one for the fingerprints
+        """
+        existing_ids = self.db.get_existing_ids(record.trans_id for record in preview.records)
+        seen_ids = set()
+        candidates = []  # (record, fingerprints) of the new records
+        
+        for record in preview.records:
+            record.duplicate_of = None
+            # Already in the database, or earlier in this workbook
+            if record.trans_id in existing_ids or record.trans_id in seen_ids:
+                record.status = 'existing'
+                continue
+            seen_ids.add(record.trans_id)
+            record.status = 'new'
+            fingerprints = self.db.fingerprint_candidates(
+                record.date, record.description, record.category,
+                record.income, record.expense, self.duplicate_window_days
+            )
+            record.fingerprint = fingerprints[0]
+            candidates.append((record, fingerprints))
+        
+        # Same content under a different ID (e.g. other branch workbook)
+        stored = self.db.find_fingerprints(
+            fingerprint for _, fingerprints in candidates for fingerprint in fingerprints
+        )
+        new_fingerprints = {}
+        for record, fingerprints in candidates:
+            for fingerprint in fingerprints:
+                duplicate_id = stored.get(fingerprint, new_fingerprints.get(fingerprint))
+                if duplicate_id is not None:
+                    record.duplicate_of = duplicate_id
+                    break
+            if not (self.skip_suspected_duplicates and record.duplicate_of is not None):
+                new_fingerprints.setdefault(record.fingerprint, record.trans_id)
+    
+    def _parse_transactions(self, workbook, preview: ImportPreview):
+        """Parse transactions from monthly sheets (01-12)"""
         # Load category mapping from Kategorien sheet
         category_map = {}
         if 'Kategorien' in workbook.sheetnames:
@@ -110,31 +355,19 @@ class ExcelImporter:
                         except (ValueError, TypeError):
                             expense = 0.0
                     
-                    # Debug: Check if transaction exists
-                    exists = self.db.transaction_exists(trans_id)
-                    
-                    if exists:
-                        self.skipped_count += 1
-                        self._log(f"  ⏭️  Row {row_idx}: ID={trans_id} übersprungen (bereits vorhanden)")
-                    else:
-                        # Try to insert
-                        if self.db.insert_transaction(trans_id, date, description, 
-                                                     category, income, expense):
-                            self.imported_count += 1
-                            self._log(f"  ✅ Row {row_idx}: ID={trans_id} importiert | {description[:30]} | E:{income} A:{expense}")
-                        else:
-                            self.skipped_count += 1
-                            self._log(f"  ❌ Row {row_idx}: ID={trans_id} konnte nicht importiert werden")
-                        
+                    preview.records.append(TransactionRecord(
+                        sheet_name, row_idx, trans_id, date, description, category, income, expense
+                    ))
+                
                 except Exception as e:
-                    self._log(f"  ❌ Row {row_idx}: Fehler - {str(e)}")
+                    self._log(f"  ❌ Row {row_idx}: Fehler - {str(e)}", error=True)
                     self._log(f"     Daten: {row[:6]}")
-                    self.error_count += 1
+                    preview.errors.append((sheet_name, row_idx, str(e)))
             
             self._log(f"  📊 Sheet {sheet_name}: {row_count} Zeilen verarbeitet")
     
-    def _import_categories(self, workbook):
-        """Import categories from 'Kategorien' sheet"""
+    def _parse_categories(self, workbook, preview: ImportPreview):
+        """Parse categories from 'Kategorien' sheet"""
         if "Kategorien" not in workbook.sheetnames:
             return
         
@@ -142,12 +375,10 @@ class ExcelImporter:
         
         for row in sheet.iter_rows(min_row=2, values_only=True):
             # Skip rows without valid data in first two columns
-            if not (row[0] and row[1]):
+            if len(row) < 2 or not (row[0] and row[1]):
                 continue
             
             try:
-                category_id = str(row[0])
-                label = str(row[1])
-                self.db.insert_category(category_id, label)
+                preview.categories.append((str(row[0]), str(row[1])))
             except Exception as e:
-                self._log(f"Error importing category: {e}")
+                self._log(f"Error importing category: {e}", error=True)
@@ -0,0 +1,153 @@
+"""
+Import Log module for Financial Transactions TCG
+Bounded in-memory log model for the GUI and asynchronous rotating file logging
+"""
+import logging
+import logging.handlers
+import queue
+from collections import deque
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QTimer
+from PyQt6.QtGui import QColor
+
+
+LEVEL_ROLE = Qt.ItemDataRole.UserRole + 1
+
+LEVEL_COLORS = {
+    logging.DEBUG: QColor("#888888"),
+    logging.WARNING: QColor("#b36b00"),
+    logging.ERROR: QColor("#c62828"),
+}
+
+
+def classify_message(message: str) -> int:
+    """Derive a logging level from an importer message"""
+    if "❌" in message or "Fehler" in message or "Error" in message:
+        return logging.ERROR
+    if "⚠️" in message:
+        return logging.WARNING
+    if message.lstrip().startswith(("✅ Row", "⏭️", "Row ")):
+        return logging.DEBUG
+    return logging.INFO
+
+
+class LogListModel(QAbstractListModel):
+    """
+    Ring buffer of log lines for a QListView.
+
+    Only the newest max_entries lines are kept. Appends are buffered and
+    flushed to the view in batches, so a flood of importer messages costs
+    one model update per flush interval instead of one per line.
+    """
+
+    def __init__(self, max_entries: int = 10000, flush_interval_ms: int = 100, parent=None):
+        super().__init__(parent)
+        self._entries = deque()
+        self._pending = []
+        self.max_entries = max_entries
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        level, text = self._entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return text
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return LEVEL_COLORS.get(level)
+        if role == LEVEL_ROLE:
+            return level
+        return None
+
+    def append(self, level: int, text: str):
+        """Queue a log line; it becomes visible with the next flush"""
+        self._pending.append((level, text))
+        if len(self._pending) >= self.max_entries:
+            self.flush()
+        elif not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Move pending lines into the ring buffer, evicting the oldest ones"""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+
+        pending = self._pending[-self.max_entries:]
+        self._pending = []
+
+        overflow = len(self._entries) + len(pending) - self.max_entries
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._entries.popleft()
+            self.endRemoveRows()
+
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(pending) - 1)
+        self._entries.extend(pending)
+        self.endInsertRows()
+
+    def clear(self):
+        """Remove all log lines"""
+        self._flush_timer.stop()
+        self._pending = []
+        self.beginResetModel()
+        self._entries.clear()
+        self.endResetModel()
+
+
+class LogLevelFilterModel(QSortFilterProxyModel):
+    """Proxy model hiding log lines below a minimum level"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._min_level = logging.DEBUG
+
+    def set_min_level(self, level: int):
+        """Change the minimum level shown in the view"""
+        self._min_level = level
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        return (self.sourceModel().data(index, LEVEL_ROLE) or logging.INFO) >= self._min_level
+
+
+class AsyncFileLogger:
+    """
+    Writes the full import log to a rotating file on a background thread.
+    The caller only puts records on a queue, so file I/O never blocks the GUI.
+    """
+
+    def __init__(self, log_path: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3):
+        """Start the background writer for the given log file"""
+        self.log_path = log_path
+        self._queue = queue.Queue()
+        self._queue_handler = logging.handlers.QueueHandler(self._queue)
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(message)s"))
+        self._listener = logging.handlers.QueueListener(self._queue, file_handler)
+        self._file_handler = file_handler
+        self._listener.start()
+
+    def log(self, level: int, message: str):
+        """Queue a message for the log file"""
+        self._queue_handler.handle(logging.makeLogRecord({
+            'levelno': level, 'levelname': logging.getLevelName(level), 'msg': message,
+        }))
+
+    def close(self):
+        """Write all queued messages and stop the background writer"""
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
+            self._file_handler.close()
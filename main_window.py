@@ -4,15 +4,57 @@ PyQt6 GUI for importing Excel files and viewing statistics
 """
 import sys
 import os
+import logging
+import sqlite3
+import threading
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QLabel, QFileDialog, QMessageBox, QTableWidget, QTableWidgetItem,
-    QGroupBox, QProgressBar, QTextEdit
+    QGroupBox, QProgressBar, QListView, QComboBox, QDialog, QDialogButtonBox, QTabWidget,
+    QHeaderView, QSpinBox, QCheckBox
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon
 from database import DatabaseManager
 from excel_importer import ExcelImporter
+from consolidation import ConsolidatedAnalytics
+from watch_folder import FolderWatcher
+from backup import BackupManager
+from balance_chart import BalanceChartWidget
+from import_log import LogListModel, LogLevelFilterModel, AsyncFileLogger, classify_message
+
+
+class PreviewThread(QThread):
+    """Background thread for a dry run of the import (nothing is written)"""
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(list)
+    
+    def __init__(self, db_path, file_paths, duplicate_window_days=0, skip_suspected_duplicates=False):
+        super().__init__()
+        self.db_path = db_path
+        self.file_paths = file_paths
+        self.duplicate_window_days = duplicate_window_days
+        self.skip_suspected_duplicates = skip_suspected_duplicates
+    
+    def run(self):
+        """Parse and classify all selected files; emits an empty list if the database failed"""
+        previews = []
+        db_manager = None
+        try:
+            db_manager = DatabaseManager(self.db_path, read_only=True)
+            importer = ExcelImporter(db_manager, progress_callback=lambda msg: self.progress.emit(msg),
+                                     duplicate_window_days=self.duplicate_window_days,
+                                     skip_suspected_duplicates=self.skip_suspected_duplicates)
+            for i, file_path in enumerate(self.file_paths, 1):
+                self.progress.emit(f"Analysiere {i}/{len(self.file_paths)}: {os.path.basename(file_path)}...")
+                previews.append(importer.preview_file(file_path))
+        except sqlite3.Error as e:
+            self.progress.emit(f"❌ Probelauf fehlgeschlagen: {e}")
+            previews = []
+        finally:
+            if db_manager:
+                db_manager.close()
+        self.finished.emit(previews)
 
 
 class ImportThread(QThread):
@@ -20,44 +62,120 @@ class ImportThread(QThread):
     progress = pyqtSignal(str)
     finished = pyqtSignal(int, int, int)
     
-    def __init__(self, db_path, file_paths):
+    def __init__(self, db_path, file_paths, previews=None, duplicate_window_days=0,
+                 skip_suspected_duplicates=False):
         super().__init__()
         self.db_path = db_path
         self.file_paths = file_paths
+        self.previews = previews  # Parsed results of a dry run, reused instead of parsing again
+        self.duplicate_window_days = duplicate_window_days
+        self.skip_suspected_duplicates = skip_suspected_duplicates
     
     def run(self):
         """Import all selected files"""
-        total_imported = 0
-        total_skipped = 0
-        total_errors = 0
-        
         # Create a NEW database manager in this thread (thread-safe)
         db_manager = DatabaseManager(self.db_path)
         
-        # Create importer with progress callback
-        importer = ExcelImporter(db_manager, progress_callback=lambda msg: self.progress.emit(msg))
-        
-        for i, file_path in enumerate(self.file_paths, 1):
-            file_name = os.path.basename(file_path)
-            self.progress.emit(f"Importiere {i}/{len(self.file_paths)}: {file_name}...")
-            
-            imported, skipped, errors = importer.import_file(file_path)
-            total_imported += imported
-            total_skipped += skipped
-            total_errors += errors
-        
-        # Close the database connection
-        db_manager.close()
+        # Create importer with progress callback; it takes a snapshot before writing
+        importer = ExcelImporter(db_manager, progress_callback=lambda msg: self.progress.emit(msg),
+                                 duplicate_window_days=self.duplicate_window_days,
+                                 skip_suspected_duplicates=self.skip_suspected_duplicates)
+        try:
+            total_imported, total_skipped, total_errors = importer.import_files(self.file_paths, self.previews)
+        except sqlite3.Error as e:
+            # The batch was rolled back, nothing of this import is stored
+            self.progress.emit(f"❌ Import abgebrochen, nichts gespeichert: {e}")
+            total_imported, total_skipped, total_errors = 0, 0, 1
+        finally:
+            # Close the database connection
+            db_manager.close()
         
         self.finished.emit(total_imported, total_skipped, total_errors)
 
 
+class ConsolidationThread(QThread):
+    """Background thread for analyzing several databases at once"""
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(dict)
+    
+    def __init__(self, db_paths):
+        super().__init__()
+        self.db_paths = db_paths
+    
+    def run(self):
+        """Run consolidated analytics over all selected databases"""
+        analytics = ConsolidatedAnalytics(
+            self.db_paths, progress_callback=lambda msg: self.progress.emit(msg)
+        )
+        self.finished.emit(analytics.run())
+
+
+class BackupThread(QThread):
+    """Background thread for online backups and snapshot restores"""
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(bool, str)
+    
+    def __init__(self, db_path, target_path, restore=False):
+        super().__init__()
+        self.db_path = db_path
+        self.target_path = target_path
+        self.restore = restore
+    
+    def run(self):
+        """Copy the database to target_path, or restore it from target_path"""
+        manager = BackupManager(self.db_path, progress_callback=lambda msg: self.progress.emit(msg))
+        try:
+            if self.restore:
+                manager.restore_snapshot(self.target_path)
+            else:
+                manager.backup(self.target_path)
+            self.finished.emit(True, self.target_path)
+        except Exception as e:
+            self.finished.emit(False, str(e))
+
+
+class WatchThread(QThread):
+    """Background thread polling a folder for new Excel files"""
+    progress = pyqtSignal(str)
+    batch_finished = pyqtSignal(int, int, int)
+    
+    def __init__(self, db_path, folder, duplicate_window_days=0, skip_suspected_duplicates=False):
+        super().__init__()
+        self.db_path = db_path
+        self.folder = folder
+        self.duplicate_window_days = duplicate_window_days
+        self.skip_suspected_duplicates = skip_suspected_duplicates
+        self.stop_event = threading.Event()
+    
+    def run(self):
+        """Watch the folder until stop() is called"""
+        watcher = FolderWatcher(
+            self.folder, self.db_path,
+            duplicate_window_days=self.duplicate_window_days,
+            skip_suspected_duplicates=self.skip_suspected_duplicates,
+            progress_callback=lambda msg: self.progress.emit(msg)
+        )
+        watcher.run(
+            stop_event=self.stop_event,
+            on_batch=lambda *counts: self.batch_finished.emit(*counts)
+        )
+    
+    def stop(self):
+        """Ask the watcher to stop after the current poll"""
+        self.stop_event.set()
+
+
 class MainWindow(QMainWindow):
     def __init__(self, db_path="transactions.db"):
         super().__init__()
         self.db_path = db_path
         self.db_manager = DatabaseManager(db_path)
         self.import_thread = None
+        self.consolidation_thread = None
+        self.preview_thread = None
+        self.watch_thread = None
+        self.backup_thread = None
+        self.file_logger = AsyncFileLogger(self._log_file_path())
         self.init_ui()
         self.update_statistics()
         self.show_database_info()
@@ -123,8 +241,13 @@ class MainWindow(QMainWindow):
         self.view_data_btn.setMinimumHeight(40)
         self.view_data_btn.clicked.connect(self.show_data_viewer)
         
+        self.balance_chart_btn = QPushButton("📉 Saldoverlauf")
+        self.balance_chart_btn.setMinimumHeight(40)
+        self.balance_chart_btn.clicked.connect(self.show_balance_chart)
+        
         button_layout.addWidget(self.refresh_btn)
         button_layout.addWidget(self.view_data_btn)
+        button_layout.addWidget(self.balance_chart_btn)
         button_layout.addStretch()
         
         main_layout.addLayout(button_layout)
@@ -140,6 +263,28 @@ class MainWindow(QMainWindow):
         switch_db_action = file_menu.addAction("🔄 Datenbank wechseln...")
         switch_db_action.triggered.connect(self.switch_database)
         
+        # Consolidated Analytics Action
+        consolidate_action = file_menu.addAction("🏢 Konsolidierte Auswertung...")
+        consolidate_action.triggered.connect(self.select_and_consolidate_databases)
+        
+        # Suspected Duplicates Action
+        duplicates_action = file_menu.addAction("🔍 Vermutliche Duplikate anzeigen...")
+        duplicates_action.triggered.connect(self.show_suspected_duplicates)
+        
+        # Watch Folder Action
+        self.watch_action = file_menu.addAction("👁️ Ordner überwachen...")
+        self.watch_action.setCheckable(True)
+        self.watch_action.triggered.connect(self.toggle_watch_folder)
+        
+        file_menu.addSeparator()
+        
+        # Backup Actions
+        backup_action = file_menu.addAction("💾 Backup erstellen...")
+        backup_action.triggered.connect(self.create_backup)
+        
+        restore_action = file_menu.addAction("⏪ Snapshot wiederherstellen...")
+        restore_action.triggered.connect(self.restore_snapshot)
+        
         file_menu.addSeparator()
         
         # Exit Action
@@ -205,6 +350,17 @@ class MainWindow(QMainWindow):
         self.import_btn.clicked.connect(self.select_and_import_files)
         layout.addWidget(self.import_btn)
         
+        # Duplicate detection options (also used by the watched folder)
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Duplikate auch bei ± Tagen abweichendem Datum:"))
+        self.duplicate_window_spin = QSpinBox()
+        self.duplicate_window_spin.setRange(0, 31)
+        options_layout.addWidget(self.duplicate_window_spin)
+        self.skip_duplicates_check = QCheckBox("Vermutliche Duplikate überspringen")
+        options_layout.addWidget(self.skip_duplicates_check)
+        options_layout.addStretch()
+        layout.addLayout(options_layout)
+        
         # Progress Bar
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -218,19 +374,63 @@ class MainWindow(QMainWindow):
         group.setLayout(layout)
         return group
     
+    def _import_options(self):
+        """Duplicate detection settings for the import threads"""
+        return {
+            'duplicate_window_days': self.duplicate_window_spin.value(),
+            'skip_suspected_duplicates': self.skip_duplicates_check.isChecked(),
+        }
+    
     def _create_log_group(self):
         """Create log display group"""
         group = QGroupBox("📋 Import-Log")
         layout = QVBoxLayout()
         
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setMaximumHeight(150)
-        layout.addWidget(self.log_text)
+        # Level filter
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Anzeigen:"))
+        self.log_level_combo = QComboBox()
+        for label, level in (("Alle Details", logging.DEBUG), ("Info", logging.INFO),
+                             ("Warnungen", logging.WARNING), ("Nur Fehler", logging.ERROR)):
+            self.log_level_combo.addItem(label, level)
+        self.log_level_combo.setCurrentIndex(1)
+        self.log_level_combo.currentIndexChanged.connect(
+            lambda _: self.log_filter.set_min_level(self.log_level_combo.currentData())
+        )
+        filter_layout.addWidget(self.log_level_combo)
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
+        
+        # Bounded log model, only visible rows are rendered by the list view
+        self.log_model = LogListModel(parent=self)
+        self.log_filter = LogLevelFilterModel(self)
+        self.log_filter.setSourceModel(self.log_model)
+        self.log_filter.set_min_level(self.log_level_combo.currentData())
+        
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_filter)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.log_view.setMaximumHeight(150)
+        # Auto-scroll to bottom
+        self.log_filter.rowsInserted.connect(lambda *_: self.log_view.scrollToBottom())
+        layout.addWidget(self.log_view)
         
         group.setLayout(layout)
         return group
     
+    def _log_file_path(self):
+        """Full import log is written next to the database"""
+        return os.path.splitext(self.db_path)[0] + "_import.log"
+    
+    def log(self, message, level=None):
+        """Append a message to the log view and the log file"""
+        for line in message.splitlines():
+            if line.strip():
+                line_level = level if level is not None else classify_message(line)
+                self.log_model.append(line_level, line)
+                self.file_logger.log(line_level, line)
+    
     def update_statistics(self):
         """Update statistics display"""
         stats = self.db_manager.get_statistics()
@@ -289,31 +489,89 @@ class MainWindow(QMainWindow):
         if not file_paths:
             return
         
-        self.start_import(file_paths)
+        self.start_preview(file_paths)
+    
+    def start_preview(self, file_paths):
+        """Analyze the selected files first, without writing to the database"""
+        self.import_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)  # Indeterminate
+        self.log_model.clear()
+        
+        self.log(f"Analysiere {len(file_paths)} Datei(en) (Probelauf)...")
+        
+        self.preview_thread = PreviewThread(self.db_path, file_paths, **self._import_options())
+        self.preview_thread.progress.connect(self.on_import_progress)
+        self.preview_thread.finished.connect(
+            lambda previews: self.on_preview_finished(file_paths, previews)
+        )
+        self.preview_thread.start()
+    
+    def on_preview_finished(self, file_paths, previews):
+        """Show what the import would do and let the user confirm it"""
+        if not previews:
+            # The dry run failed, the reason is in the log
+            self.progress_bar.setVisible(False)
+            self.import_btn.setEnabled(True)
+            return
+        
+        summary = "Probelauf abgeschlossen - es wurde noch nichts gespeichert.\n\n"
+        monthly = {}
+        for preview in previews:
+            summary += f"📄 {os.path.basename(preview.file_path)}\n"
+            if preview.load_error:
+                summary += f"   ❌ Datei nicht lesbar: {preview.load_error}\n"
+                continue
+            summary += (f"   ✅ Neu: {preview.new_count} | ⏭️ Vorhanden: {preview.existing_count} | "
+                        f"❌ Fehler: {preview.error_count}\n")
+            if preview.duplicate_count:
+                summary += f"   ⚠️ Vermutliche Duplikate: {preview.duplicate_count}\n"
+            for month, income, expense, count in preview.monthly_totals():
+                totals = monthly.setdefault(month, [0.0, 0.0, 0])
+                totals[0] += income
+                totals[1] += expense
+                totals[2] += count
+        
+        if monthly:
+            summary += "\nNeue Transaktionen pro Monat:\n"
+            for month, (income, expense, count) in sorted(monthly.items()):
+                summary += f"   {month or '–'}: {count} | E: €{income:,.2f} | A: €{expense:,.2f}\n"
+        
+        self.log(summary, logging.INFO)
+        
+        reply = QMessageBox.question(
+            self,
+            "Import bestätigen",
+            summary + "\nImport jetzt durchführen?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        
+        if reply != QMessageBox.StandardButton.Yes:
+            self.progress_bar.setVisible(False)
+            self.import_btn.setEnabled(True)
+            self.status_label.setText("Import abgebrochen")
+            return
+        
+        self.start_import(file_paths, previews)
     
-    def start_import(self, file_paths):
+    def start_import(self, file_paths, previews=None):
         """Start import process in background thread"""
         self.import_btn.setEnabled(False)
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)  # Indeterminate
-        self.log_text.clear()
         
-        self.log_text.append(f"Starte Import von {len(file_paths)} Datei(en)...\n")
+        self.log(f"Starte Import von {len(file_paths)} Datei(en)...")
         
         # Create and start import thread (pass db_path instead of db_manager for thread safety)
-        self.import_thread = ImportThread(self.db_path, file_paths)
+        self.import_thread = ImportThread(self.db_path, file_paths, previews, **self._import_options())
         self.import_thread.progress.connect(self.on_import_progress)
         self.import_thread.finished.connect(self.on_import_finished)
         self.import_thread.start()
     
     def on_import_progress(self, message):
         """Handle progress updates from import thread"""
-        self.log_text.append(message)
+        self.log(message)
         self.status_label.setText(message)
-        # Auto-scroll to bottom
-        self.log_text.verticalScrollBar().setValue(
-            self.log_text.verticalScrollBar().maximum()
-        )
     
     def on_import_finished(self, imported, skipped, errors):
         """Handle import completion"""
@@ -338,7 +596,7 @@ Import abgeschlossen!
 📊 Gesamt in Datenbank: {total_transactions} Transaktionen
         """
         
-        self.log_text.append("\n" + result_msg)
+        self.log(result_msg, logging.WARNING if errors > 0 else logging.INFO)
         self.status_label.setText("Import abgeschlossen!")
         
         # Show detailed message box
@@ -356,6 +614,119 @@ Import abgeschlossen!
             if reply == QMessageBox.StandardButton.Yes:
                 self.show_data_viewer()
     
+    def toggle_watch_folder(self, checked):
+        """Start or stop automatic import from a watched folder"""
+        if not checked:
+            self.stop_watch_folder()
+            return
+        
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            "Zu überwachenden Ordner wählen",
+            os.path.dirname(self.db_path) or os.getcwd()
+        )
+        
+        if not folder:
+            self.watch_action.setChecked(False)
+            return
+        
+        self.watch_thread = WatchThread(self.db_path, folder, **self._import_options())
+        self.watch_thread.progress.connect(self.on_import_progress)
+        self.watch_thread.batch_finished.connect(self.on_watch_batch_finished)
+        self.watch_thread.start()
+        self.watch_action.setText(f"👁️ Ordner überwachen ({os.path.basename(folder)})")
+    
+    def stop_watch_folder(self):
+        """Stop the folder watcher and wait for a running batch to finish"""
+        if self.watch_thread:
+            self.watch_thread.stop()
+            self.watch_thread.wait()
+            self.watch_thread = None
+        self.watch_action.setChecked(False)
+        self.watch_action.setText("👁️ Ordner überwachen...")
+    
+    def on_watch_batch_finished(self, imported, skipped, errors):
+        """Refresh statistics after the watcher imported a batch of files"""
+        self.update_statistics()
+        self.show_database_info()
+        self.status_label.setText(
+            f"Automatischer Import: {imported} neu, {skipped} übersprungen, {errors} Fehler"
+        )
+    
+    def _is_busy(self):
+        """Check whether a background thread is writing to or copying the database"""
+        threads = (self.preview_thread, self.import_thread, self.watch_thread, self.backup_thread)
+        return any(thread and thread.isRunning() for thread in threads)
+    
+    def create_backup(self):
+        """Copy the open database to a backup file without blocking imports"""
+        if self.backup_thread and self.backup_thread.isRunning():
+            return
+        
+        stem = os.path.splitext(os.path.basename(self.db_path))[0]
+        dest_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Backup speichern",
+            os.path.join(os.path.dirname(self.db_path), f"{stem}_backup.db"),
+            "SQLite Datenbank (*.db);;Alle Dateien (*.*)"
+        )
+        
+        if not dest_path:
+            return
+        
+        self._start_backup_thread(dest_path, restore=False)
+    
+    def restore_snapshot(self):
+        """Roll the database back to a snapshot"""
+        if self._is_busy():
+            QMessageBox.warning(
+                self,
+                "Snapshot wiederherstellen",
+                "Bitte warten, bis laufende Importe, Backups und die Ordnerüberwachung beendet sind."
+            )
+            return
+        
+        snapshot_dir = BackupManager(self.db_path).snapshot_dir
+        snapshot_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Snapshot wählen",
+            snapshot_dir if os.path.isdir(snapshot_dir) else os.path.dirname(self.db_path),
+            "SQLite Datenbank (*.db);;Alle Dateien (*.*)"
+        )
+        
+        if not snapshot_path:
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            "Snapshot wiederherstellen",
+            f"Datenbank {os.path.basename(self.db_path)} durch den Snapshot ersetzen?\n"
+            f"{os.path.basename(snapshot_path)}\n\n"
+            f"Alle Änderungen seit dem Snapshot gehen verloren.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            self._start_backup_thread(snapshot_path, restore=True)
+    
+    def _start_backup_thread(self, target_path, restore):
+        """Run a backup or restore in the background"""
+        self.status_label.setText("Snapshot wird wiederhergestellt..." if restore else "Backup läuft...")
+        self.backup_thread = BackupThread(self.db_path, target_path, restore=restore)
+        self.backup_thread.progress.connect(self.on_import_progress)
+        self.backup_thread.finished.connect(self.on_backup_finished)
+        self.backup_thread.start()
+    
+    def on_backup_finished(self, success, detail):
+        """Report backup/restore result and refresh the view"""
+        if not success:
+            self.log(f"❌ Backup fehlgeschlagen: {detail}")
+            QMessageBox.warning(self, "Backup", f"Fehler: {detail}")
+            return
+        
+        self.update_statistics()
+        self.show_database_info()
+    
     def show_data_viewer(self):
         """Show data viewer window"""
         transactions = self.db_manager.get_all_transactions()
@@ -389,6 +760,11 @@ Import abgeschlossen!
         dialog.setStandardButtons(QMessageBox.StandardButton.Ok)
         dialog.exec()
     
+    def show_balance_chart(self):
+        """Show the running balance over time"""
+        chart = BalanceChartWidget(self.db_manager)
+        self._show_table_dialog(f"Saldoverlauf - {os.path.basename(self.db_path)}", chart)
+    
     def switch_database(self):
         """Allow user to switch to a different database"""
         dialog = QFileDialog()
@@ -413,18 +789,140 @@ Import abgeschlossen!
                 )
                 
                 if reply == QMessageBox.StandardButton.Yes:
+                    # The watcher imports into the old database
+                    self.stop_watch_folder()
+                    
                     # Close current database
                     self.db_manager.close()
                     
                     # Open new database
                     self.db_path = new_db_path
                     self.db_manager = DatabaseManager(new_db_path)
+                    self.file_logger.close()
+                    self.file_logger = AsyncFileLogger(self._log_file_path())
                     
                     # Update UI
                     self.update_statistics()
                     self.show_database_info()
-                    self.log_text.clear()
-                    self.log_text.append(f"✅ Datenbank gewechselt zu:\n{new_db_path}\n")
+                    self.log_model.clear()
+                    self.log(f"✅ Datenbank gewechselt zu:\n{new_db_path}")
+    
+    def select_and_consolidate_databases(self):
+        """Select several databases and compute group totals across them"""
+        if self.consolidation_thread and self.consolidation_thread.isRunning():
+            return
+        
+        db_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Datenbanken für konsolidierte Auswertung auswählen",
+            os.path.dirname(self.db_path) or os.getcwd(),
+            "SQLite Datenbank (*.db);;Alle Dateien (*.*)"
+        )
+        
+        if not db_paths:
+            return
+        
+        self.log_model.clear()
+        self.log(f"Starte konsolidierte Auswertung von {len(db_paths)} Datenbank(en)...")
+        self.status_label.setText("Konsolidierte Auswertung läuft...")
+        
+        self.consolidation_thread = ConsolidationThread(db_paths)
+        self.consolidation_thread.progress.connect(self.on_import_progress)
+        self.consolidation_thread.finished.connect(self.on_consolidation_finished)
+        self.consolidation_thread.start()
+    
+    def on_consolidation_finished(self, report):
+        """Show per-database and grand totals of a consolidated analysis"""
+        self.status_label.setText("Konsolidierte Auswertung abgeschlossen!")
+        
+        for path, error in report['errors'].items():
+            self.log(f"❌ {os.path.basename(path)} übersprungen: {error}")
+        
+        if not report['databases']:
+            QMessageBox.warning(
+                self,
+                "Konsolidierte Auswertung",
+                "Keine der gewählten Datenbanken konnte ausgewertet werden."
+            )
+            return
+        
+        db_rows = []
+        for path, data in report['databases'].items():
+            stats = data['statistics']
+            db_rows.append((os.path.basename(path), stats['total_transactions'],
+                            stats['total_income'], stats['total_expenses'], stats['balance']))
+        total = report['total']['statistics']
+        db_rows.append(("Gesamt", total['total_transactions'],
+                        total['total_income'], total['total_expenses'], total['balance']))
+        
+        breakdown_headers = ["Einnahmen", "Ausgaben", "Anzahl"]
+        
+        tabs = QTabWidget()
+        tabs.addTab(self._create_table(["Datenbank", "Transaktionen", "Einnahmen", "Ausgaben", "Saldo"],
+                               db_rows), "🏢 Datenbanken")
+        tabs.addTab(self._create_table(["Monat"] + breakdown_headers,
+                               [(month or "–", *values) for month, *values in report['total']['monthly']]),
+                    "📅 Monate")
+        tabs.addTab(self._create_table(["Kategorie"] + breakdown_headers,
+                               [(cat or "–", *values) for cat, *values in report['total']['categories']]),
+                    "🏷️ Kategorien")
+        
+        self._show_table_dialog(
+            f"Konsolidierte Auswertung ({len(report['databases'])} Datenbanken)", tabs
+        )
+    
+    def show_suspected_duplicates(self):
+        """Show transactions that share their content with another transaction"""
+        duplicates = self.db_manager.get_suspected_duplicates()
+        
+        if not duplicates:
+            QMessageBox.information(
+                self,
+                "Vermutliche Duplikate",
+                "Es wurden keine vermutlichen Duplikate gefunden."
+            )
+            return
+        
+        # Number the groups consecutively
+        group_numbers = {}
+        rows = []
+        for group_id, trans_id, date, desc, cat, income, expense in duplicates:
+            group = group_numbers.setdefault(group_id, len(group_numbers) + 1)
+            rows.append((group, trans_id, date, desc, cat, income or 0.0, expense or 0.0))
+        
+        table = self._create_table(
+            ["Gruppe", "ID", "Datum", "Beschreibung", "Kategorie", "Einnahmen", "Ausgaben"], rows
+        )
+        self._show_table_dialog(
+            f"Vermutliche Duplikate ({len(group_numbers)} Gruppen, {len(rows)} Transaktionen)", table
+        )
+    
+    def _create_table(self, headers, rows):
+        """Create a read-only table widget; floats are formatted as currency"""
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        for row_idx, row in enumerate(rows):
+            for col_idx, value in enumerate(row):
+                text = f"€{value:,.2f}" if isinstance(value, float) else str(value)
+                item = QTableWidgetItem(text)
+                if col_idx > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(row_idx, col_idx, item)
+        return table
+    
+    def _show_table_dialog(self, title, widget):
+        """Show a widget (table, tabs or chart) in a simple modal dialog"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle(title)
+        dialog.resize(800, 500)
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(widget)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
+        buttons.accepted.connect(dialog.accept)
+        layout.addWidget(buttons)
+        dialog.exec()
     
     def show_about(self):
         """Show about dialog"""
@@ -437,16 +935,24 @@ Import abgeschlossen!
         <p>Import-Tool für Excel-basierte Transaktionsdaten</p>
         <p>
         <b>Features:</b><br>
-        • Multi-File Excel-Import<br>
+        • Multi-File Excel-Import mit Probelauf<br>
+        • Automatischer Import aus überwachtem Ordner<br>
         • Live-Statistiken<br>
+        • Saldoverlauf<br>
         • SQLite-Datenbank<br>
-        • Duplikat-Prüfung<br>
-        • Datenbank-Verwaltung
+        • Duplikat-Prüfung (ID und Inhalt)<br>
+        • Datenbank-Verwaltung<br>
+        • Online-Backup und Snapshots vor jedem Import<br>
+        • Konsolidierte Auswertung mehrerer Datenbanken
         </p>
         """
         QMessageBox.about(self, "Über Financial Transactions TCG", about_text)
     
     def closeEvent(self, event):
         """Handle window close event"""
+        self.stop_watch_folder()
+        if self.backup_thread:
+            self.backup_thread.wait()
         self.db_manager.close()
+        self.file_logger.close()
         event.accept()
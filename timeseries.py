@@ -0,0 +1,76 @@
+"""
+Time series module for Financial Transactions TCG
+Downsampling of (x, y) series for charts
+"""
+from typing import List, Sequence, Tuple
+
+
+Point = Tuple[float, float]
+
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Keeps the first and last point and, per bucket, the point forming the
+    largest triangle with its neighbours - this preserves the visual shape.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # Index of the previously selected point
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle corner
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_bucket = points[next_start:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = points[a]
+        best_area = -1.0
+        best_index = start
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best_index = j
+
+        sampled.append(points[best_index])
+        a = best_index
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def minmax_downsample(points: Sequence[Point], threshold: int) -> List[Point]:
+    """
+    Min/max bucket downsampling.
+    Every bucket contributes its lowest and highest point (in x order), so
+    peaks are never lost; returns at most threshold points.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 4:
+        return list(points)
+
+    buckets = (threshold - 2) // 2
+    sampled = [points[0]]
+    bucket_size = (n - 2) / buckets
+    for i in range(buckets):
+        start = int(i * bucket_size) + 1
+        end = min(int((i + 1) * bucket_size) + 1, n - 1)
+        if start >= end:
+            continue
+        bucket = range(start, end)
+        low = min(bucket, key=lambda j: points[j][1])
+        high = max(bucket, key=lambda j: points[j][1])
+        for j in sorted({low, high}):
+            sampled.append(points[j])
+    sampled.append(points[-1])
+    return sampled
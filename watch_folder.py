@@ -0,0 +1,199 @@
+"""
+Watch Folder module for Financial Transactions TCG
+Automatically imports Excel files dropped into a directory
+
+Headless usage:
+    python watch_folder.py <folder> --db transactions.db
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from database import DatabaseManager
+from excel_importer import ExcelImporter
+
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+class FolderWatcher:
+    """
+    Polls a directory and imports new or changed Excel files.
+
+    Each poll takes a cheap (mtime, size) snapshot of the folder. A file is
+    only imported once its snapshot has been unchanged for settle_seconds,
+    so workbooks that are still being copied or saved are left alone. All
+    files that become ready in the same poll are imported in one write
+    transaction. A file whose import had errors is retried on the next
+    polls, up to max_attempts times until it changes again.
+    """
+
+    def __init__(self, folder: str, db_path: str, settle_seconds: float = 2.0,
+                 import_existing: bool = True, max_attempts: int = 3,
+                 duplicate_window_days: int = 0, skip_suspected_duplicates: bool = False,
+                 progress_callback: Optional[Callable[[str], None]] = None):
+        """
+        Initialize watcher for folder, importing into db_path.
+        duplicate_window_days and skip_suspected_duplicates are passed to ExcelImporter.
+        """
+        self.folder = folder
+        self.db_path = db_path
+        self.settle_seconds = settle_seconds
+        self.max_attempts = max_attempts
+        self.duplicate_window_days = duplicate_window_days
+        self.skip_suspected_duplicates = skip_suspected_duplicates
+        self.progress_callback = progress_callback
+        self._candidates = {}  # path -> (signature, first seen with this signature)
+        self._imported = {}    # path -> signature at import time
+        self._failures = {}    # path -> (signature, failed attempts with this signature)
+        if not import_existing:
+            self._imported = dict(self._snapshot())
+
+    def _log(self, message: str):
+        """Log message to console and optionally to GUI"""
+        print(message)
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Current (mtime_ns, size) of all Excel files in the folder"""
+        snapshot = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                # Skip Excel lock files (~$name.xlsx) and anything that is not a workbook
+                if entry.name.startswith('~$') or not entry.name.lower().endswith(EXCEL_EXTENSIONS):
+                    continue
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue  # File vanished between listing and stat
+        return snapshot
+
+    def scan(self) -> List[str]:
+        """Return files that are new or changed and have settled since the last poll"""
+        now = time.monotonic()
+        snapshot = self._snapshot()
+        ready = []
+
+        for path, signature in snapshot.items():
+            if self._imported.get(path) == signature:
+                continue
+            failure = self._failures.get(path)
+            if failure and failure[0] == signature and failure[1] >= self.max_attempts:
+                continue  # Given up until the file changes
+            previous = self._candidates.get(path)
+            if previous is None or previous[0] != signature:
+                # New or still changing - restart the debounce timer
+                self._candidates[path] = (signature, now)
+            elif now - previous[1] >= self.settle_seconds:
+                ready.append(path)
+
+        # Forget files that were removed from the folder
+        for path in list(self._candidates):
+            if path not in snapshot:
+                del self._candidates[path]
+        for path in list(self._failures):
+            if path not in snapshot:
+                del self._failures[path]
+
+        return sorted(ready)
+
+    def import_files(self, file_paths: List[str]) -> Tuple[int, int, int]:
+        """
+        Import the given files in a single batched write transaction.
+        Only files imported without errors are marked as done; the others stay
+        candidates. If the transaction fails (e.g. database locked) the
+        exception propagates and no file is marked.
+        """
+        db_manager = DatabaseManager(self.db_path)
+        importer = ExcelImporter(db_manager, progress_callback=self.progress_callback,
+                                 duplicate_window_days=self.duplicate_window_days,
+                                 skip_suspected_duplicates=self.skip_suspected_duplicates)
+        try:
+            result = importer.import_files(file_paths)
+        finally:
+            db_manager.close()
+
+        for file_path in file_paths:
+            signature = self._candidates[file_path][0]
+            if importer.file_results.get(file_path, (0, 0, 1))[2] == 0:
+                del self._candidates[file_path]
+                self._failures.pop(file_path, None)
+                self._imported[file_path] = signature
+                continue
+
+            failure = self._failures.get(file_path)
+            attempts = failure[1] + 1 if failure and failure[0] == signature else 1
+            self._failures[file_path] = (signature, attempts)
+            if attempts >= self.max_attempts:
+                del self._candidates[file_path]
+                self._log(f"❌ {os.path.basename(file_path)}: Import nach {attempts} Versuchen fehlerhaft, "
+                          f"erneuter Versuch erst nach Änderung der Datei")
+            else:
+                self._log(f"⚠️ {os.path.basename(file_path)}: Import fehlerhaft, neuer Versuch beim nächsten Durchlauf")
+
+        return result
+
+    def poll_once(self) -> Optional[Tuple[int, int, int]]:
+        """Scan once and import all ready files; returns None if nothing was imported"""
+        ready = self.scan()
+        if not ready:
+            return None
+        return self.import_files(ready)
+
+    def run(self, poll_interval: float = 5.0, stop_event: Optional[threading.Event] = None,
+            on_batch: Optional[Callable[[int, int, int], None]] = None):
+        """Poll until stop_event is set (or forever when headless)"""
+        stop_event = stop_event or threading.Event()
+        self._log(f"👁️ Überwache Ordner: {self.folder}")
+        while not stop_event.is_set():
+            try:
+                result = self.poll_once()
+            except OSError as e:
+                self._log(f"❌ Ordner nicht lesbar: {e}")
+                result = None
+            except sqlite3.Error as e:
+                # Batch was rolled back - the files stay candidates for the next poll
+                self._log(f"❌ Datenbankfehler, Import wird wiederholt: {e}")
+                result = None
+            if result is not None:
+                imported, skipped, errors = result
+                self._log(f"📊 Neu: {imported} | Übersprungen: {skipped} | Fehler: {errors}")
+                if on_batch:
+                    on_batch(imported, skipped, errors)
+            stop_event.wait(poll_interval)
+        self._log("Ordnerüberwachung beendet")
+
+
+def main():
+    """Headless entry point"""
+    parser = argparse.ArgumentParser(description="Excel-Dateien aus einem Ordner automatisch importieren")
+    parser.add_argument("folder", help="Zu überwachender Ordner")
+    parser.add_argument("--db", default="transactions.db", help="SQLite Datenbank")
+    parser.add_argument("--interval", type=float, default=5.0, help="Abfrageintervall in Sekunden")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Sekunden ohne Änderung, bevor eine Datei importiert wird")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="Bereits vorhandene Dateien nicht importieren")
+    parser.add_argument("--duplicate-window", type=int, default=0, metavar="TAGE",
+                        help="Duplikate auch mit bis zu TAGE Tagen abweichendem Datum erkennen")
+    parser.add_argument("--skip-duplicates", action="store_true",
+                        help="Vermutliche Duplikate nicht importieren")
+    args = parser.parse_args()
+
+    watcher = FolderWatcher(args.folder, args.db, settle_seconds=args.settle,
+                            import_existing=not args.skip_existing,
+                            duplicate_window_days=args.duplicate_window,
+                            skip_suspected_duplicates=args.skip_duplicates)
+    try:
+        watcher.run(poll_interval=args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()